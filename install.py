@@ -19,16 +19,14 @@ def install_winpm():
 python "{target_script}" %*
 '''
     batch_file = target_dir / 'winpm.bat'
-    with open(batch_file, 'w') as f:
-        f.write(batch_content)
+    batch_file.write_text(batch_content)
     
     # Create PowerShell wrapper (optional)
     ps_content = f'''#!/usr/bin/env pwsh
 python "{target_script}" $args
 '''
     ps_file = target_dir / 'winpm.ps1'
-    with open(ps_file, 'w') as f:
-        f.write(ps_content)
+    ps_file.write_text(ps_content)
     
     print(f"WinPM installed to {target_dir}")
     print("Please add the following to your PATH environment variable:")
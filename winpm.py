@@ -1,20 +1,85 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
 import json
+import logging
 import os
 import subprocess
 import sys
 import shutil
 import requests
+import requests.adapters
 import tempfile
 import zipfile
 import hashlib
+import time
+import pickle
 import concurrent.futures
+import functools
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library parser
+    orjson = None
+
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:  # Version checks fall back to numeric tuple comparison
+    Version = None
+
+try:
+    import ijson
+except ImportError:  # Exact lookups fall back to a full manifest parse
+    ijson = None
+
+def json_loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    """Serialize to indented UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def write_json_atomic(path, obj):
+    """Write JSON to a temporary file and swap it into place"""
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(json_dumps(obj))
+    os.replace(tmp, path)
+
+@functools.lru_cache(maxsize=None)
+def parse_version(version):
+    """Parse a version string, caching the result (None if unparseable)"""
+    if Version is not None:
+        try:
+            return Version(version)
+        except InvalidVersion:
+            return None
+    
+    # Without packaging, handle plain dotted numeric versions
+    parts = version.split('.')
+    if not all(part.isdigit() for part in parts):
+        return None
+    numbers = [int(part) for part in parts]
+    while len(numbers) > 1 and numbers[-1] == 0:
+        numbers.pop()
+    return tuple(numbers)
+
+def is_newer_version(candidate, current):
+    """Check whether candidate is a newer version than current"""
+    candidate_version = parse_version(candidate)
+    current_version = parse_version(current)
+    if candidate_version is None or current_version is None:
+        return candidate != current
+    return candidate_version > current_version
+
 class WinPM:
     def __init__(self):
         self.base_dir = Path(os.getenv('LOCALAPPDATA')) / 'winpm'
@@ -23,12 +88,35 @@ class WinPM:
         self.install_dir = self.base_dir / 'packages'
         self.cache_dir = self.base_dir / 'cache'
         self.repos_dir = self.base_dir / 'repositories'
+        self._repo_cache = {}
+        self._deps_cache = {}
+        self._pkgs_cache = None
+        self._packages_dirty = False
         
         self.ensure_directories()
         self.load_config()
         
+        self.log = logging.getLogger('winpm')
+        verbose = self.config['settings'].get('show_verbose_output', False)
+        self.log.setLevel(logging.DEBUG if verbose else logging.INFO)
+        
+        # Shared session so repeated requests reuse pooled connections
+        pool_size = self.config['settings'].get('max_parallel_downloads', 3)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Backstop for library use; the CLI flushes explicitly
+        atexit.register(self._flush)
+        
     def ensure_directories(self):
         """Create necessary directories"""
+        # Skip the setup work once a previous run has completed it
+        sentinel = self.base_dir / '.initialized'
+        if sentinel.exists() and self.config_file.exists():
+            return
+        
         for directory in [self.base_dir, self.install_dir, self.cache_dir, self.repos_dir]:
             directory.mkdir(exist_ok=True)
             
@@ -53,77 +141,165 @@ class WinPM:
                     "max_parallel_downloads": 3
                 }
             }
-            with open(self.config_file, 'w') as f:
-                json.dump(default_config, f, indent=2)
+            self.config_file.write_bytes(json_dumps(default_config))
+        
+        sentinel.touch()
     
     def load_config(self):
         """Load configuration"""
-        with open(self.config_file, 'r') as f:
-            self.config = json.load(f)
+        with open(self.config_file, 'rb') as f:
+            self.config = json_loads(f.read())
     
     def save_config(self):
         """Save configuration"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        write_json_atomic(self.config_file, self.config)
     
     def load_packages(self):
         """Load installed packages"""
+        if self._packages_dirty:
+            return self._pkgs_cache[1]
         if not self.packages_file.exists():
-            return {}
-        with open(self.packages_file, 'r') as f:
-            return json.load(f)
+            if not self._pkgs_cache or self._pkgs_cache[0] is not None:
+                self._pkgs_cache = (None, {})
+            return self._pkgs_cache[1]
+        
+        mtime = self.packages_file.stat().st_mtime_ns
+        if self._pkgs_cache and self._pkgs_cache[0] == mtime:
+            return self._pkgs_cache[1]
+        
+        with open(self.packages_file, 'rb') as f:
+            packages = json_loads(f.read())
+        self._pkgs_cache = (mtime, packages)
+        return packages
     
     def save_packages(self, packages):
-        """Save installed packages"""
-        with open(self.packages_file, 'w') as f:
-            json.dump(packages, f, indent=2)
+        """Save installed packages (written to disk on exit)"""
+        self._pkgs_cache = (None, packages)
+        self._packages_dirty = True
+    
+    def _flush(self):
+        """Write pending package changes to disk"""
+        if not self._packages_dirty:
+            return
+        packages = self._pkgs_cache[1]
+        write_json_atomic(self.packages_file, packages)
+        self._pkgs_cache = (self.packages_file.stat().st_mtime_ns, packages)
+        self._packages_dirty = False
     
     def get_repository_url(self, repo_name):
         """Get repository URL by name"""
         return self.config['repositories'].get(repo_name, {}).get('url')
     
     def download_file(self, url, destination):
-        """Download a file with progress"""
+        """Download a file with progress, returning its SHA-256 digest"""
+        # Stream into a sibling so an interrupted download never looks complete
+        partial = destination.with_name(destination.name + '.part')
         try:
-            response = requests.get(url, stream=True, timeout=self.config['settings']['download_timeout'])
+            response = self.session.get(url, stream=True, timeout=self.config['settings']['download_timeout'])
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', 0))
             downloaded = 0
+            hasher = hashlib.sha256()
+            interactive = sys.stdout.isatty()
+            show_progress = total_size > 0 and (interactive or self.log.isEnabledFor(logging.DEBUG))
+            last_report = 0.0
             
-            with open(destination, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            # Hash while streaming so the file does not need to be re-read
+            with open(partial, 'wb', buffering=1 << 20) as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
                     if chunk:
+                        hasher.update(chunk)
                         f.write(chunk)
                         downloaded += len(chunk)
-                        if total_size > 0:
-                            percent = (downloaded / total_size) * 100
-                            print(f"\rDownloading: {percent:.1f}% ({downloaded}/{total_size} bytes)", end='')
+                        
+                        # Throttle progress output to a few updates per second
+                        if not show_progress:
+                            continue
+                        now = time.monotonic()
+                        if now - last_report >= 0.25 or downloaded >= total_size:
+                            last_report = now
+                            if interactive:
+                                percent = (downloaded / total_size) * 100
+                                print(f"\rDownloading: {percent:.1f}% ({downloaded}/{total_size} bytes)", end='')
+                            else:
+                                self.log.debug("Downloading: %d%% (%d/%d bytes)",
+                                               downloaded * 100 // total_size, downloaded, total_size)
             
-            print()  # New line after progress
-            return True
+            if interactive and show_progress:
+                print()  # New line after progress
+            os.replace(partial, destination)
+            return hasher.hexdigest()
         except requests.RequestException as e:
             print(f"\nDownload failed: {e}")
-            return False
+            partial.unlink(missing_ok=True)
+            return None
     
     def update_repositories(self):
         """Update all repository manifests"""
         print("Updating repositories...")
-        for repo_name, repo_info in self.config['repositories'].items():
-            repo_url = repo_info['url']
-            manifest_url = urljoin(repo_url, 'repository.json')
-            local_file = self.repos_dir / f"{repo_name}.json"
-            
+        
+        def _fetch_one(repo_name, repo_info):
+            manifest_url = urljoin(repo_info['url'], 'repository.json')
+            meta = self._load_repository_meta(repo_name)
+            headers = {}
+            if (self.repos_dir / f"{repo_name}.json").exists():
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
             try:
-                response = requests.get(manifest_url, timeout=10)
+                response = self.session.get(manifest_url, headers=headers, timeout=10)
+                if response.status_code == 304:
+                    return repo_name, response, None, None
                 response.raise_for_status()
+                return repo_name, response, json_loads(response.content), None
+            except Exception as e:
+                return repo_name, None, None, e
+        
+        self.repos_dir.mkdir(parents=True, exist_ok=True)
+        repositories = self.config['repositories']
+        max_workers = max(1, self.config['settings'].get('max_parallel_downloads', 3))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda item: _fetch_one(*item), repositories.items())
+            
+            for repo_name, response, manifest, error in results:
+                if error is not None:
+                    print(f"✗ Failed to update {repo_name}: {error}")
+                    continue
+                
+                if manifest is None:
+                    print(f"✓ {repo_name} repository is up to date")
+                    continue
                 
-                with open(local_file, 'w', encoding='utf-8') as f:
-                    json.dump(response.json(), f, indent=2)
+                local_file = self.repos_dir / f"{repo_name}.json"
+                with open(local_file, 'wb') as f:
+                    f.write(json_dumps(manifest))
+                
+                self._save_repository_meta(repo_name, {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                })
+                self._invalidate_repository(repo_name)
                 
                 print(f"✓ Updated {repo_name} repository")
-            except Exception as e:
-                print(f"✗ Failed to update {repo_name}: {e}")
+    
+    def _load_repository_meta(self, repo_name):
+        """Load HTTP cache validators for a repository manifest"""
+        meta_file = self.repos_dir / f"{repo_name}.meta.json"
+        if not meta_file.exists():
+            return {}
+        try:
+            with open(meta_file, 'rb') as f:
+                return json_loads(f.read())
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_repository_meta(self, repo_name, meta):
+        """Save HTTP cache validators for a repository manifest"""
+        meta_file = self.repos_dir / f"{repo_name}.meta.json"
+        with open(meta_file, 'wb') as f:
+            f.write(json_dumps(meta))
     
     def load_repository(self, repo_name):
         """Load repository manifest"""
@@ -131,25 +307,101 @@ class WinPM:
         if not repo_file.exists():
             return None
         
-        with open(repo_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def find_package(self, package_name):
-        """Find package across all repositories"""
-        packages = []
+        stat = repo_file.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
         
-        for repo_name in self.config['repositories']:
+        cached = self._repo_cache.get(repo_name)
+        if cached and cached[0] == key:
+            return cached[1]
+        
+        # Reuse the parsed manifest from the sidecar cache when the source is unchanged
+        cache_file = self.repos_dir / f"{repo_name}.json.cache"
+        data = None
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'rb') as f:
+                    cached_key, cached_data = pickle.load(f)
+                if cached_key == key and '_index' in cached_data:
+                    data = cached_data
+            except Exception:
+                data = None
+        
+        if data is None:
+            with open(repo_file, 'rb') as f:
+                data = json_loads(f.read())
+            
+            # Lowercased search index, persisted with the parsed manifest
+            data['_index'] = [
+                (name, name.lower(), info.get('description', '').lower(), info)
+                for name, info in data.get('packages', {}).items()
+            ]
+            try:
+                with open(cache_file, 'wb') as f:
+                    pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            except OSError:
+                pass
+        
+        self._repo_cache[repo_name] = (key, data)
+        return data
+    
+    def _invalidate_repository(self, repo_name):
+        """Drop cached data derived from a repository manifest"""
+        self._repo_cache.pop(repo_name, None)
+        self.__dict__.pop('_all_packages', None)
+        self._deps_cache.clear()
+    
+    @functools.cached_property
+    def _all_packages(self):
+        """Map package names to their entries across repositories, by priority"""
+        repositories = self.config['repositories']
+        index = {}
+        
+        for repo_name in sorted(repositories, key=lambda name: repositories[name].get('priority', 0)):
             repo_data = self.load_repository(repo_name)
-            if repo_data and package_name in repo_data['packages']:
-                package_info = repo_data['packages'][package_name]
+            if not repo_data:
+                continue
+            for package_name, package_info in repo_data['packages'].items():
                 package_info['repository'] = repo_name
-                packages.append(package_info)
+                index.setdefault(package_name, []).append(package_info)
         
-        return packages
+        return index
+    
+    def _find_in_manifest(self, repo_name, package_name):
+        """Find a package in one repository, streaming the manifest when possible"""
+        repo_file = self.repos_dir / f"{repo_name}.json"
+        if not repo_file.exists():
+            return None
+        
+        # A fresh pickled sidecar is cheaper to load than streaming the JSON
+        cache_file = self.repos_dir / f"{repo_name}.json.cache"
+        sidecar_fresh = (cache_file.exists() and
+                         cache_file.stat().st_mtime_ns >= repo_file.stat().st_mtime_ns)
+        
+        # Stop parsing at the first match instead of materializing the whole manifest
+        package_info = None
+        if ijson is not None and repo_name not in self._repo_cache and not sidecar_fresh:
+            with open(repo_file, 'rb') as f:
+                for name, info in ijson.kvitems(f, 'packages', use_float=True):
+                    if name == package_name:
+                        package_info = info
+                        break
+        else:
+            package_info = self.load_repository(repo_name)['packages'].get(package_name)
+        
+        if package_info is not None:
+            package_info['repository'] = repo_name
+        return package_info
+    
+    def find_package(self, package_name):
+        """Find package across all repositories"""
+        return self._all_packages.get(package_name, [])
     
     def resolve_dependencies(self, package_info):
         """Resolve package dependencies"""
-        dependencies = package_info.get('dependencies', [])
+        dependencies = tuple(package_info.get('dependencies', []))
+        if dependencies in self._deps_cache:
+            return self._deps_cache[dependencies]
+        
         resolved = []
         
         for dep in dependencies:
@@ -162,9 +414,10 @@ class WinPM:
             else:
                 print(f"Warning: Dependency {dep} not found")
         
+        self._deps_cache[dependencies] = resolved
         return resolved
     
-    def install_package(self, package_name, version=None, repo_name=None):
+    def install_package(self, package_name, version=None, repo_name=None, offline=False):
         """Install a package with dependencies"""
         packages = self.load_packages()
         
@@ -174,7 +427,7 @@ class WinPM:
         
         # Find package
         if repo_name:
-            package_info = self.load_repository(repo_name)['packages'].get(package_name)
+            package_info = self._find_in_manifest(repo_name, package_name)
         else:
             package_infos = self.find_package(package_name)
             if not package_infos:
@@ -186,30 +439,75 @@ class WinPM:
             print(f"Package {package_name} not found!")
             return False
         
-        # Resolve dependencies
-        dependencies = self.resolve_dependencies(package_info)
-        for dep in dependencies:
-            print(f"Installing dependency: {dep['name']}")
-            self.install_package(dep['name'])
+        # Resolve the full dependency tree into install order
+        order = []
+        self._collect_deps(package_name, package_info, set(), order)
+        
+        # Record whatever was installed, even if a later package fails
+        try:
+            for dep_name, dep_info in order[:-1]:
+                if dep_name in packages:
+                    continue
+                print(f"Installing dependency: {dep_name}")
+                self._install_single(dep_name, dep_info, packages, offline=offline)
+            
+            return self._install_single(package_name, package_info, packages, version, offline)
+        finally:
+            self.save_packages(packages)
+    
+    def _collect_deps(self, package_name, package_info, visited, order):
+        """Append a package and its dependencies to order in post-order"""
+        if package_name in visited:
+            return
+        visited.add(package_name)
         
-        # Download and install
+        for dep in self.resolve_dependencies(package_info):
+            self._collect_deps(dep['name'], dep['info'], visited, order)
+        
+        order.append((package_name, package_info))
+    
+    def _install_single(self, package_name, package_info, packages, version=None, offline=False):
+        """Download, extract and register a single package"""
         version = version or package_info.get('version', '1.0.0')
         download_url = package_info['url']
         
         print(f"Installing {package_name} {version}...")
         
-        # Download package
+        # Reuse a previously downloaded archive when it is known to be intact
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         download_path = self.cache_dir / f"{package_name}_{version}.zip"
-        if not self.download_file(download_url, download_path):
-            return False
+        expected_hash = self.expected_hash(package_info)
+        file_hash = None
+        if download_path.exists():
+            if expected_hash:
+                cached_hash = self.calculate_hash(download_path)
+                if cached_hash == expected_hash:
+                    file_hash = cached_hash
+            elif offline and zipfile.is_zipfile(download_path):
+                # Without a listed hash, at least require a complete archive
+                file_hash = self.calculate_hash(download_path)
+            if file_hash:
+                self.log.debug("Using cached download %s", download_path.name)
+        
+        # Download package
+        if not file_hash:
+            if offline:
+                print(f"No usable cached download for {package_name} {version} (offline)")
+                return False
+            file_hash = self.download_file(download_url, download_path)
+            if not file_hash:
+                return False
+            if expected_hash and file_hash != expected_hash:
+                print(f"Hash mismatch for {package_name} {version}: expected {expected_hash}, got {file_hash}")
+                download_path.unlink(missing_ok=True)
+                return False
         
         # Extract package
         package_dir = self.install_dir / package_name
-        package_dir.mkdir(exist_ok=True)
+        package_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            with zipfile.ZipFile(download_path, 'r') as zipf:
-                zipf.extractall(package_dir)
+            self.extract_archive(download_path, package_dir)
         except Exception as e:
             print(f"Failed to extract package: {e}")
             return False
@@ -221,24 +519,65 @@ class WinPM:
             'executable': package_info.get('executable', f"{package_name}.exe"),
             'repository': package_info.get('repository', 'unknown'),
             'install_date': datetime.now().isoformat(),
-            'hash': self.calculate_hash(download_path)
+            'hash': file_hash
         }
         
-        self.save_packages(packages)
-        
         # Add to PATH (create shim)
         self.create_shim(package_name, package_info)
         
         print(f"✓ Installed {package_name} {version}")
         return True
     
+    def extract_archive(self, archive_path, destination):
+        """Extract a zip archive, inflating members in parallel"""
+        with zipfile.ZipFile(archive_path, 'r') as zipf:
+            members = zipf.infolist()
+            
+            files = [member for member in members if not member.is_dir()]
+            if len(files) < 2:
+                zipf.extractall(destination)
+                return
+            
+            # Let zipfile sanitise member paths; directory entries go first, serially
+            for member in members:
+                if member.is_dir():
+                    zipf.extract(member, destination)
+        
+        def _extract_chunk(chunk):
+            # Each worker reads through its own handle rather than sharing one
+            with zipfile.ZipFile(archive_path, 'r') as worker_zipf:
+                for member in chunk:
+                    try:
+                        worker_zipf.extract(member, destination)
+                    except FileExistsError:
+                        # Another worker created the parent directory between zipfile's check and makedirs
+                        worker_zipf.extract(member, destination)
+        
+        # zlib releases the GIL, so members inflate concurrently
+        workers = min(os.cpu_count() or 1, len(files))
+        chunks = [files[i::workers] for i in range(workers)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_extract_chunk, chunks))
+    
+    def expected_hash(self, package_info):
+        """Get the SHA-256 digest a repository lists for a package, if any"""
+        value = package_info.get('hash', '')
+        algorithm, _, digest = value.rpartition(':')
+        if algorithm not in ('', 'sha256'):
+            return None
+        return digest.lower() or None
+    
     def calculate_hash(self, file_path):
         """Calculate file hash"""
-        hasher = hashlib.sha256()
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            
+            # Python < 3.11: hash in large chunks to keep the loop in C
+            hasher = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
                 hasher.update(chunk)
-        return hasher.hexdigest()
+            return hasher.hexdigest()
     
     def create_shim(self, package_name, package_info):
         """Create executable shim"""
@@ -254,11 +593,10 @@ class WinPM:
 "{actual_exe}" %*
 '''
         shim_file = shim_dir / f"{package_name}.bat"
-        with open(shim_file, 'w') as f:
-            f.write(shim_content)
+        shim_file.write_text(shim_content)
         
         # Add shim directory to PATH (user needs to do this manually)
-        print(f"Shim created: {shim_file}")
+        self.log.debug("Shim created: %s", shim_file)
     
     def uninstall(self, package_name):
         """Uninstall a package"""
@@ -307,14 +645,17 @@ class WinPM:
         
         # Download repository manifest
         manifest_url = urljoin(repo_url, 'repository.json')
+        self.repos_dir.mkdir(parents=True, exist_ok=True)
         local_file = self.repos_dir / f"{repo_name}.json"
         
         try:
-            response = requests.get(manifest_url, timeout=10)
+            response = self.session.get(manifest_url, timeout=10)
             response.raise_for_status()
             
-            with open(local_file, 'w', encoding='utf-8') as f:
-                json.dump(response.json(), f, indent=2)
+            with open(local_file, 'wb') as f:
+                f.write(json_dumps(json_loads(response.content)))
+            
+            self._invalidate_repository(repo_name)
             
             print(f"✓ Added repository {repo_name}")
             return True
@@ -332,9 +673,11 @@ class WinPM:
         self.save_config()
         
         # Remove local manifest
-        manifest_file = self.repos_dir / f"{repo_name}.json"
-        if manifest_file.exists():
-            manifest_file.unlink()
+        for suffix in ('.json', '.json.cache', '.meta.json'):
+            manifest_file = self.repos_dir / f"{repo_name}{suffix}"
+            if manifest_file.exists():
+                manifest_file.unlink()
+        self._invalidate_repository(repo_name)
         
         print(f"✓ Removed repository {repo_name}")
         return True
@@ -344,17 +687,18 @@ class WinPM:
         print(f"Searching for '{query}':")
         print("-" * 60)
         
+        q = query.lower()
+        installed_names = set(self.load_packages())
         found = False
         for repo_name in self.config['repositories']:
             repo_data = self.load_repository(repo_name)
             if not repo_data:
                 continue
             
-            for pkg_name, pkg_info in repo_data['packages'].items():
-                if (query.lower() in pkg_name.lower() or 
-                    query.lower() in pkg_info.get('description', '').lower()):
+            for pkg_name, name_l, desc_l, pkg_info in repo_data['_index']:
+                if q in name_l or q in desc_l:
                     
-                    installed = pkg_name in self.load_packages()
+                    installed = pkg_name in installed_names
                     status = "✓" if installed else " "
                     
                     print(f"{status} {pkg_name:20} {pkg_info.get('version', '?'):10} "
@@ -376,13 +720,14 @@ class WinPM:
                 current_version = pkg_info['version']
                 available = self.find_package(pkg_name)
                 
-                if available and available[0]['version'] != current_version:
+                if available and is_newer_version(available[0]['version'], current_version):
                     print(f"Update available for {pkg_name}: {current_version} -> {available[0]['version']}")
                     # Add update logic here
     
     def cleanup(self):
         """Clean up cache and temporary files"""
         print("Cleaning up cache...")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         for item in self.cache_dir.iterdir():
             if item.is_file():
                 item.unlink()
@@ -401,6 +746,7 @@ def main():
     install_parser.add_argument('package', help='Package name to install')
     install_parser.add_argument('--version', '-v', help='Specific version to install')
     install_parser.add_argument('--repo', '-r', help='Specific repository to use')
+    install_parser.add_argument('--offline', action='store_true', help='Install from cached downloads only')
     
     # Uninstall command
     uninstall_parser = subparsers.add_parser('uninstall', help='Uninstall a package')
@@ -435,6 +781,7 @@ def main():
     subparsers.add_parser('cleanup', help='Clean up cache files')
     
     args = parser.parse_args()
+    logging.basicConfig(format='%(message)s')
     
     if not args.command:
         parser.print_help()
@@ -444,7 +791,7 @@ def main():
     
     try:
         if args.command == 'install':
-            pm.install_package(args.package, args.version, args.repo)
+            pm.install_package(args.package, args.version, args.repo, args.offline)
         elif args.command == 'uninstall':
             pm.uninstall(args.package)
         elif args.command == 'list':
@@ -475,6 +822,10 @@ def main():
                 pm.remove_repository(args.name)
         elif args.command == 'cleanup':
             pm.cleanup()
+        
+        # Persist pending registry changes here so write errors are reported
+        atexit.unregister(pm._flush)
+        pm._flush()
     except Exception as e:
         print(f"Error: {e}")
         import traceback